@@ -14,13 +14,65 @@ Requirements:
 
 import bpy
 import bmesh
+import numpy as np
+import io
 import os
+import re
 import sys
+import json
+import time
+import mmap
+import queue
+import hashlib
+import struct
+import argparse
+import threading
+import subprocess
 import traceback
 from pathlib import Path
 from mathutils import Vector
 import tempfile
 import shutil
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    # Optional: Pillow (or the SIMD-accelerated pillow-simd fork) installed into Blender's Python
+    from PIL import Image
+except ImportError:
+    Image = None
+
+try:
+    # Reports whether Pillow's JPEG codec is libjpeg-turbo (logged at startup)
+    from PIL import features as pil_features
+except ImportError:
+    pil_features = None
+
+try:
+    # Optional: lossless mozjpeg re-optimization of Pillow's JPEG output (see JPEG_ENCODER)
+    import mozjpeg_lossless_optimization
+except ImportError:
+    mozjpeg_lossless_optimization = None
+
+try:
+    # Optional: xxhash for faster texture content hashing (hashlib.blake2b otherwise)
+    import xxhash
+except ImportError:
+    xxhash = None
+
+try:
+    # Optional: orjson for faster glTF JSON header parsing
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
+try:
+    # Optional: CuPy for GPU downscaling of very large textures (see USE_GPU_RESIZE)
+    import cupy
+    import cupyx.scipy.ndimage
+except ImportError:
+    cupy = None
 
 # ================================
 # CONFIGURATION VARIABLES
@@ -45,6 +97,18 @@ TEXTURE_FORMAT = 'AUTO'
 # JPEG quality (1-100, only applies if using JPEG compression)
 JPEG_QUALITY = 80
 
+# zlib level for PNG textures encoded with Pillow (1 = fastest, 6 = balanced, 9 = smallest)
+PNG_COMPRESS_LEVEL = 6
+
+# JPEG encoder used with Pillow: 'turbo' (libjpeg-turbo) or 'mozjpeg' (turbo output
+# losslessly re-optimized with mozjpeg; requires the mozjpeg-lossless-optimization package)
+JPEG_ENCODER = 'turbo'
+
+# Image format written by Blender's glTF exporter: 'AUTO' embeds the optimized JPEG/PNG
+# textures as-is; 'WEBP' re-encodes them as WebP (EXT_texture_webp, Blender 4.0+), which is
+# typically 25-35% smaller than JPEG but not supported by every viewer
+EXPORT_IMAGE_FORMAT = 'AUTO'
+
 # Preserve original file format (True = GLTF stays GLTF, False = convert GLTF to GLB)
 PRESERVE_FORMAT = False
 
@@ -58,38 +122,152 @@ REMOVE_SPECULAR = True
 AGGRESSIVE_JPEG_CONVERSION = True
 
 # Force compression even when not resizing (helps reduce file size)
+# Textures already at or below TARGET_RESOLUTION and in their target format are left untouched
 FORCE_COMPRESSION = True
 
+# Re-encode .glb output textures as KTX2/Basis Universal (KHR_texture_basisu); requires the
+# basisu command-line tool. GPU-native textures, but only for viewers supporting the extension
+USE_KTX2 = False
+
+# Optimize .glb textures by rewriting the file directly with Pillow instead of a Blender
+# import/export round-trip (meshes and other buffers are copied byte-for-byte; REMOVE_SPECULAR
+# is applied to the material JSON). Falls back to Blender for .gltf/.vrm files, when
+# REMOVE_SPECULAR meets KHR_materials_specular textures, or on errors
+DIRECT_GLB = True
+
+# Optimize .glb/.gltf files with the gltf-transform CLI (npm install -g @gltf-transform/cli)
+# instead of a Blender import/export round-trip. Only used when REMOVE_SPECULAR is False,
+# TEXTURE_FORMAT is 'JPEG' or 'PNG' and the output is .glb; falls back to Blender on failure
+USE_GLTF_TRANSFORM = False
+
+# Copy .glb/.vrm files straight through when their header shows nothing to optimize
+# (every texture already a JPEG at or below TARGET_RESOLUTION and, with REMOVE_SPECULAR,
+# every material's specular already 0), without importing into Blender. Off while USE_KTX2 is set
+SKIP_OPTIMIZED_FILES = True
+
+# Copy the original file instead when optimizing made it larger (same-format .glb/.vrm only).
+# Off by default: the original may keep textures above TARGET_RESOLUTION and specular data
+KEEP_ORIGINAL_IF_LARGER = False
+
+# Downscale very large textures on an NVIDIA GPU when CuPy is installed (falls back to Pillow)
+USE_GPU_RESIZE = False
+
+# Minimum source texture size (longest side) worth the GPU upload cost
+GPU_RESIZE_MIN_SIZE = 2048
+
+# Memory budget for reusing encoded textures shared between files (0 = disabled)
+TEXTURE_CACHE_LIMIT_MB = 256
+
+# Directory where encoded textures are cached across runs and worker processes, keyed by
+# source content hash and encode settings ('' = disabled)
+CACHE_DIR = ""
+
+# Threads encoding textures within one file (0 = auto: the CPU cores divided among the
+# parallel Blender workers). Pillow releases the GIL while resizing/encoding, so threads
+# scale across cores
+TEXTURE_WORKERS = 0
+
+# Number of parallel headless Blender workers (0 = auto: half the CPU cores, 1 = process serially)
+WORKER_COUNT = 0
+
+# Files handled by one worker process before it exits (bounds Blender's memory growth)
+FILES_PER_WORKER = 20
+
+# Seconds allowed per file before a hung worker is killed
+FILE_TIMEOUT = 300
+
+# Input file extensions picked up from INPUT_DIR (matched case-insensitively)
+SUPPORTED_EXTENSIONS = ('.glb', '.gltf', '.vrm')
+
+# Prefix of the per-file result lines workers report back to the parent process
+RESULT_PREFIX = "@@RESULT "
+
 # ================================
 # UTILITY FUNCTIONS
 # ================================
 
+# Blender processes sharing the CPU (set from --workers in worker mode)
+_parallel_workers = 1
+
+# (file name, formatted traceback) of files that failed, printed after the batch (VERBOSE)
+ERROR_TRACEBACKS = []
+
+# Encoded textures reused across the batch, keyed by source content hash + encode settings
+TEX_CACHE = {}
+_tex_cache_bytes = 0
+# Guards TEX_CACHE inserts and _tex_cache_bytes across the encode threads
+_tex_cache_lock = threading.Lock()
+
+# Image names that identify tangent-space normal maps
+_NORMAL_MAP_RE = re.compile(r'_n\.|normal|_nrm', re.IGNORECASE)
+# Image names that get PNG in AUTO mode: precision data maps, and (without
+# AGGRESSIVE_JPEG_CONVERSION) maps whose alpha is assumed from the name
+_PRECISION_MAP_RE = re.compile(r'normal|nrm|bump|roughness|metallic|occlusion|height|displace'
+                               r'|(?<![a-z])ao(?![a-z])', re.IGNORECASE)
+_ALPHA_MAP_RE = re.compile(r'alpha|opacity|mask', re.IGNORECASE)
+# Matches 'specular_tint', 'spectint', 'spec_tint' and 'specular tint' in lowercased names
+_SPEC_TINT_RE = re.compile(r'spec(?:ular)?[_ ]?tint')
+# Required glTF extensions the direct GLB path can pass through: they reference data
+# by bufferView/accessor index, which the rewrite preserves
+_DIRECT_GLB_EXTENSIONS = frozenset({
+    'KHR_draco_mesh_compression', 'KHR_mesh_quantization', 'KHR_texture_transform',
+    'KHR_materials_unlit', 'KHR_texture_basisu', 'EXT_texture_webp',
+})
+# Principled BSDF specular sockets (names differ between Blender 3.x and 4.x)
+_SPEC_INPUTS = ('Specular', 'Specular IOR Level', 'Specular Tint')
+# KHR_materials_specular texture slots (dropped along with the specular by the Blender path)
+_SPEC_TEXTURE_SLOTS = frozenset({'specularTexture', 'specularColorTexture'})
+_TINT_WHITE_COLOR = (1.0, 1.0, 1.0, 1.0)
+_ZERO_COLOR = (0.0, 0.0, 0.0, 1.0)
+
 def log(message, level="INFO"):
     """Print formatted log message."""
     print(f"[{level}] {message}")
 
+def describe_pillow():
+    """Describe the Pillow build in use (pillow-simd versions carry a '.postN' suffix)."""
+    if Image is None:
+        return "not installed (using Blender's image pipeline)"
+    import PIL
+    build = "pillow-simd" if ".post" in PIL.__version__ else "Pillow"
+    try:
+        turbo = pil_features is not None and pil_features.check_feature('libjpeg_turbo')
+    except ValueError:
+        turbo = False  # Pillow too old to report it
+    return f"{build} {PIL.__version__}, JPEG codec: {'libjpeg-turbo' if turbo else 'libjpeg'}"
+
+def configure_blender():
+    """Configure Blender for headless batch processing."""
+    # Set Blender to use CPU for rendering (more stable for batch processing)
+    bpy.context.scene.cycles.device = 'CPU'
+    
+    # Nothing is ever undone in batch mode, so don't record undo steps
+    try:
+        bpy.context.preferences.edit.use_global_undo = False
+        bpy.context.preferences.edit.undo_steps = 0
+    except Exception as e:
+        log(f"Warning: Could not disable undo: {e}", "WARNING")
+    
+    # No .blend is ever saved: skip autosave timers and backup versions
+    try:
+        bpy.context.preferences.filepaths.save_version = 0
+        bpy.context.preferences.filepaths.use_auto_save_temporary_files = False
+    except Exception as e:
+        log(f"Warning: Could not disable autosave: {e}", "WARNING")
+
 def clear_scene():
     """Clear all objects, materials, and images from the current scene."""
     try:
-        # Clear all mesh objects
-        bpy.ops.object.select_all(action='SELECT')
-        bpy.ops.object.delete(use_global=False)
-        
-        # Clear orphaned data
-        for block in bpy.data.meshes:
-            bpy.data.meshes.remove(block)
-        for block in bpy.data.materials:
-            bpy.data.materials.remove(block)
-        for block in bpy.data.images:
-            bpy.data.images.remove(block)
-        for block in bpy.data.textures:
-            bpy.data.textures.remove(block)
-        for block in bpy.data.node_groups:
-            bpy.data.node_groups.remove(block)
-            
-        # Clear collections
-        for collection in bpy.data.collections:
-            bpy.data.collections.remove(collection)
+        # Remove objects and their orphaned data in one batch_remove call: one
+        # depsgraph update and free pass instead of one per datablock
+        ids = []
+        # (actions too: export_file only exports animations when any exist)
+        for collection in (bpy.data.objects, bpy.data.meshes, bpy.data.materials, bpy.data.images,
+                           bpy.data.textures, bpy.data.node_groups, bpy.data.collections,
+                           bpy.data.actions, bpy.data.armatures):
+            ids.extend(collection)
+        if ids:
+            bpy.data.batch_remove(ids=ids)
             
         if VERBOSE:
             log("Scene cleared successfully")
@@ -97,30 +275,64 @@ def clear_scene():
     except Exception as e:
         log(f"Warning: Error clearing scene: {e}", "WARNING")
 
+class _ScratchPool:
+    """Reusable flat NumPy buffers so per-texture pixel reads don't reallocate.
+    
+    Buffers grow geometrically and are returned as views; a view is only valid
+    until the next get() with the same dtype (main thread only).
+    """
+    
+    def __init__(self):
+        self._buffers = {}
+    
+    def get(self, size, dtype=np.float32):
+        key = np.dtype(dtype).str
+        buf = self._buffers.get(key)
+        if buf is None or buf.size < size:
+            capacity = size if buf is None else max(size, buf.size * 2)
+            buf = np.empty(capacity, dtype=dtype)
+            self._buffers[key] = buf
+        return buf[:size]
+
+SCRATCH = _ScratchPool()
+
+def alpha_is_meaningful(pixels, tolerance=0.98):
+    """Check a flat RGBA float buffer for any alpha value below tolerance (vectorized)."""
+    return bool((pixels[3::4] < tolerance).any())
+
 def has_alpha_channel(image):
     """Check if image actually uses alpha channel (has transparency)."""
     try:
-        if not image or not image.pixels:
+        if not image:
+            return False
+        
+        # JPEG/BMP sources can't store alpha; checking the format doesn't load the image buffer
+        if getattr(image, 'file_format', '') in ('JPEG', 'BMP'):
+            return False
+        
+        # Rule out images without an alpha channel from metadata alone (RGBA is
+        # 32/64/128 bits per pixel for 8-bit/16-bit/float) before touching pixels
+        if getattr(image, 'depth', 0) not in (32, 64, 128) or getattr(image, 'channels', 0) != 4:
+            return False
+        
+        if not image.pixels:
             return False
         
         # Check if image has alpha channel data
-        if len(image.pixels) % 4 != 0:
+        pixel_count = len(image.pixels)
+        if pixel_count % 4 != 0:
             return False  # No alpha channel in pixel data
         
-        # Sample alpha values to see if any are not 1.0 (fully opaque)
-        # Only check a sample of pixels for performance (every 100th pixel)
-        pixels = image.pixels[:]
-        alpha_values = pixels[3::4]  # Every 4th value is alpha
+        # Copy pixels straight into a NumPy buffer (no Python list of floats)
+        # and scan the whole alpha channel in one vectorized pass
+        pixels = SCRATCH.get(pixel_count, np.float32)
+        image.pixels.foreach_get(pixels)
         
-        # Sample every 100th alpha value for performance
-        sample_step = max(1, len(alpha_values) // 1000)  # Check at most 1000 pixels
-        
-        # If any sampled alpha value is not 1.0, we need transparency
-        for i in range(0, len(alpha_values), sample_step):
-            if alpha_values[i] < 0.98:  # Small tolerance for floating point
-                if VERBOSE:
-                    log(f"Alpha channel detected in '{image.name}' (alpha value: {alpha_values[i]:.3f})")
-                return True
+        # If any alpha value is not 1.0, we need transparency
+        if alpha_is_meaningful(pixels):
+            if VERBOSE:
+                log(f"Alpha channel detected in '{image.name}' (alpha value: {pixels[3::4].min():.3f})")
+            return True
         
         return False
     except Exception as e:
@@ -129,23 +341,36 @@ def has_alpha_channel(image):
         # If we can't determine, be conservative and assume no alpha
         return False
 
-def get_texture_format(image_name, node_type=None, image=None):
-    """Determine optimal texture format based on image type and actual usage."""
+def is_normal_map(image_name, node=None):
+    """Detect normal maps by name or by the texture feeding a Normal Map node."""
+    if _NORMAL_MAP_RE.search(image_name):
+        return True
+    
+    if node is not None and node.outputs:
+        for link in node.outputs[0].links:
+            if link.to_node.type == 'NORMAL_MAP':
+                return True
+    
+    return False
+
+def get_texture_format(image_name, node_type=None, image=None, alpha=False):
+    """Determine optimal texture format based on image type and actual usage.
+    
+    alpha gives the alpha usage of textures that aren't Blender images (direct GLB path).
+    """
     if TEXTURE_FORMAT == 'PNG':
         return 'PNG'
     elif TEXTURE_FORMAT == 'JPEG':
         return 'JPEG'
     else:  # AUTO - smart format selection
-        name_lower = image_name.lower()
-        
         # Always use PNG for normal maps, roughness, metallic (they need precision)
-        if any(keyword in name_lower for keyword in ['normal', 'nrm', 'bump', 'roughness', 'metallic']):
+        if _PRECISION_MAP_RE.search(image_name):
             return 'PNG'
         
         # If aggressive JPEG conversion is enabled, check for actual alpha usage
         if AGGRESSIVE_JPEG_CONVERSION:
             # Only keep PNG if image actually uses alpha channel
-            if image and has_alpha_channel(image):
+            if has_alpha_channel(image) if image else alpha:
                 if VERBOSE:
                     log(f"Keeping '{image_name}' as PNG due to alpha channel usage")
                 return 'PNG'
@@ -157,7 +382,7 @@ def get_texture_format(image_name, node_type=None, image=None):
                 return 'JPEG'
         else:
             # Conservative approach - check name patterns
-            if any(keyword in name_lower for keyword in ['alpha', 'opacity', 'mask']):
+            if _ALPHA_MAP_RE.search(image_name):
                 return 'PNG'
         
         # For everything else (diffuse, color, etc.), use JPEG for better compression
@@ -182,15 +407,6 @@ def clean_material_properties(material):
         nodes_to_remove = []
         links_to_remove = []
         
-        # Log current specular values for debugging
-        if VERBOSE:
-            for node in material.node_tree.nodes:
-                if node.type == 'BSDF_PRINCIPLED':
-                    for input_name in ['Specular', 'Specular IOR Level', 'Specular Tint']:
-                        if input_name in node.inputs:
-                            input_socket = node.inputs[input_name]
-                            log(f"Material '{material.name}' - {input_name} current value: {input_socket.default_value}")
-        
         for node in material.node_tree.nodes:
             # Remove specular tint texture nodes
             if node.type == 'TEX_IMAGE' and node.image:
@@ -198,55 +414,57 @@ def clean_material_properties(material):
                 node_name_lower = node.name.lower()
                 
                 # Check both image name and node name for specular tint
-                if any(keyword in image_name_lower for keyword in ['specular_tint', 'spectint', 'spec_tint', 'specular tint']) or \
-                   any(keyword in node_name_lower for keyword in ['specular_tint', 'spectint', 'spec_tint', 'specular tint']):
+                if _SPEC_TINT_RE.search(image_name_lower) or _SPEC_TINT_RE.search(node_name_lower):
                     if VERBOSE:
                         log(f"Removing specular tint texture: {node.image.name} (node: {node.name})")
                     # Disconnect all links from this node
                     for output in node.outputs:
                         for link in output.links:
                             links_to_remove.append(link)
-                    nodes_to_remove.append(node)
+                    if node not in nodes_to_remove:
+                        nodes_to_remove.append(node)
             
             # Set specular values to 0 on principled BSDF
             elif node.type == 'BSDF_PRINCIPLED':
-                # Handle different input names for specular
-                specular_inputs = []
-                
-                # Check for various specular input names
-                for input_name in ['Specular', 'Specular IOR Level', 'Specular Tint']:
-                    if input_name in node.inputs:
-                        specular_inputs.append(node.inputs[input_name])
-                
-                for specular_input in specular_inputs:
+                # Handle the different specular input names across Blender versions
+                for input_name in _SPEC_INPUTS:
+                    # inputs.get() is a keyed lookup; 'in node.inputs' scans the collection
+                    specular_input = node.inputs.get(input_name)
+                    if specular_input is None:
+                        continue
+                    # Log current specular values for debugging (same pass as the mutation)
+                    if VERBOSE:
+                        log(f"Material '{material.name}' - {input_name} current value: {specular_input.default_value}")
+                    
                     try:
                         # Disconnect any links to specular input
                         for link in specular_input.links:
                             links_to_remove.append(link)
+                            
+                            # Drop image textures that only feed specular sockets
+                            source = link.from_node
+                            if (source.type == 'TEX_IMAGE' and source not in nodes_to_remove
+                                    and all(l.to_node.type == 'BSDF_PRINCIPLED' and l.to_socket.name in _SPEC_INPUTS
+                                            for output in source.outputs for l in output.links)):
+                                if VERBOSE and source.image:
+                                    log(f"Removing specular texture: {source.image.name} (node: {source.name})")
+                                nodes_to_remove.append(source)
                         
-                        # Set specular to 0
-                        if specular_input.name == 'Specular Tint':
-                            # Specular Tint can be float or color - check the socket type
-                            if hasattr(specular_input, 'default_value'):
-                                current_val = specular_input.default_value
-                                if isinstance(current_val, (int, float)):
-                                    specular_input.default_value = 1.0  # White for float
-                                else:
-                                    specular_input.default_value = (1.0, 1.0, 1.0, 1.0)  # White for color
-                        else:
-                            # Regular specular inputs should be 0
-                            if hasattr(specular_input, 'default_value'):
-                                if isinstance(specular_input.default_value, (int, float)):
-                                    specular_input.default_value = 0.0
-                                else:
-                                    specular_input.default_value = (0.0, 0.0, 0.0, 1.0)
+                        # Specular Tint goes to white, other specular inputs to 0;
+                        # each can be a float or a color socket
+                        if hasattr(specular_input, 'default_value'):
+                            is_tint = input_name == 'Specular Tint'
+                            if type(specular_input.default_value) in (float, int):
+                                specular_input.default_value = 1.0 if is_tint else 0.0
+                            else:
+                                specular_input.default_value = _TINT_WHITE_COLOR if is_tint else _ZERO_COLOR
                         
                         if VERBOSE:
-                            log(f"Set {specular_input.name} to {specular_input.default_value} on material: {material.name}")
+                            log(f"Set {input_name} to {specular_input.default_value} on material: {material.name}")
                     
                     except Exception as e:
                         if VERBOSE:
-                            log(f"Warning: Could not set {specular_input.name} on material {material.name}: {e}", "WARNING")
+                            log(f"Warning: Could not set {input_name} on material {material.name}: {e}", "WARNING")
             
             # Also handle other specular-related nodes
             elif node.type in ['BSDF_GLOSSY', 'BSDF_ANISOTROPIC']:
@@ -255,26 +473,328 @@ def clean_material_properties(material):
                     log(f"Found specular node type {node.type} in material {material.name} - marking for removal")
                 nodes_to_remove.append(node)
         
-        # Remove the marked links first
-        for link in links_to_remove:
-            try:
-                material.node_tree.links.remove(link)
-            except:
-                pass  # Link might already be removed
+        # Remove everything in one block and tag the tree once at the end. Links
+        # from nodes being removed go away with the node, so only the rest are
+        # unlinked one by one (node_tree.nodes/links have no batch removal).
+        if links_to_remove or nodes_to_remove:
+            node_tree = material.node_tree
+            removed_names = {node.name for node in nodes_to_remove}
+            for link in links_to_remove:
+                if link.from_node.name in removed_names:
+                    continue
+                try:
+                    node_tree.links.remove(link)
+                except Exception:
+                    pass  # Link might already be removed
+            
+            for node in nodes_to_remove:
+                node_name = node.name
+                try:
+                    node_tree.nodes.remove(node)
+                    if VERBOSE:
+                        log(f"Successfully removed node '{node_name}' from material '{material.name}'")
+                except Exception as e:
+                    if VERBOSE:
+                        log(f"Warning: Could not remove node '{node_name}' from material '{material.name}': {e}", "WARNING")
+            
+            node_tree.update_tag()
+            
+    except Exception as e:
+        log(f"Warning: Error cleaning material properties for '{material.name}': {e}", "WARNING")
+
+def purge_orphan_images():
+    """Remove every image left without users (e.g. removed specular textures) in one call."""
+    orphans = [image for image in bpy.data.images if image.users == 0]
+    if orphans:
+        bpy.data.batch_remove(ids=orphans)
+        if VERBOSE:
+            log(f"Removed {len(orphans)} unused images")
+
+def peek_image_header(data):
+    """Read (format, width, height) from PNG/JPEG header bytes without decoding pixels.
+    
+    Returns None when the format is not recognised.
+    """
+    if data[:8] == b'\x89PNG\r\n\x1a\n' and len(data) >= 24:
+        # IHDR is always the first chunk: width and height follow the chunk type
+        width, height = struct.unpack('>II', data[16:24])
+        return 'PNG', width, height
+    
+    if data[:2] == b'\xff\xd8':
+        # Walk JPEG segments until a start-of-frame marker
+        i = 2
+        while i + 9 < len(data):
+            if data[i] != 0xFF:
+                return None
+            marker = data[i + 1]
+            if marker == 0xFF:
+                i += 1
+                continue
+            if marker == 0x01 or 0xD0 <= marker <= 0xD8:
+                i += 2
+                continue
+            if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+                height, width = struct.unpack('>HH', data[i + 5:i + 9])
+                return 'JPEG', width, height
+            i += 2 + struct.unpack('>H', data[i + 2:i + 4])[0]
+    
+    return None
+
+def png_is_16bit_gray(data):
+    """Check a PNG header for 16-bit grayscale (AO/height/data maps that JPEG would wreck)."""
+    # IHDR bit depth at byte 24, color type 0 (gray) or 4 (gray + alpha) at byte 25
+    return data[:8] == b'\x89PNG\r\n\x1a\n' and len(data) >= 26 and data[24] == 16 and data[25] in (0, 4)
+
+def png_can_have_alpha(data):
+    """Check PNG header chunks for an alpha channel or tRNS transparency, without decoding."""
+    # IHDR color types 4 (gray + alpha) and 6 (RGBA) carry alpha
+    if data[25] in (4, 6):
+        return True
+    # Other types only through a tRNS chunk, which must come before the image data
+    idat = data.find(b'IDAT')
+    return data.find(b'tRNS', 0, idat if idat != -1 else len(data)) != -1
+
+def read_image_pixels_u8(image):
+    """Read an image's pixels once into a top-down HxWx4 uint8 RGBA array.
+    
+    The float read and uint8 conversion reuse SCRATCH buffers; only the
+    returned array (handed to encoder threads) is freshly allocated.
+    """
+    width, height = image.size[0], image.size[1]
+    pixels = SCRATCH.get(width * height * 4, np.float32)
+    image.pixels.foreach_get(pixels)
+    
+    # Blender stores rows bottom-up as 0..1 floats
+    np.multiply(pixels, 255.0, out=pixels)
+    np.add(pixels, 0.5, out=pixels)
+    np.clip(pixels, 0.0, 255.0, out=pixels)
+    pixels_u8 = SCRATCH.get(pixels.size, np.uint8)
+    np.copyto(pixels_u8, pixels, casting='unsafe')
+    return pixels_u8.reshape(height, width, 4)[::-1].copy()
+
+def get_image_source_bytes(image):
+    """Return the encoded bytes backing an image (embedded data or file on disk), or None."""
+    if image.packed_file is not None:
+        return bytes(image.packed_file.data)
+    
+    filepath = bpy.path.abspath(image.filepath_raw) if image.filepath_raw else ''
+    if filepath and os.path.isfile(filepath):
+        with open(filepath, 'rb') as f:
+            return f.read()
+    
+    return None
+
+def resize_pixels_gpu(pixels, width, height):
+    """Downscale an HxWxC uint8 array on the GPU: integer box prefilter, then bicubic."""
+    src = cupy.asarray(pixels, dtype=cupy.float32)
+    src_h, src_w, channels = src.shape
+    
+    # Average whole blocks first so the bicubic pass doesn't alias on large reductions
+    ky = max(1, src_h // height)
+    kx = max(1, src_w // width)
+    if ky > 1 or kx > 1:
+        src = src[:src_h - src_h % ky, :src_w - src_w % kx]
+        src = src.reshape(src_h // ky, ky, src_w // kx, kx, channels).mean(axis=(1, 3))
+    
+    src_h, src_w = src.shape[:2]
+    if (src_h, src_w) != (height, width):
+        src = cupyx.scipy.ndimage.zoom(src, (height / src_h, width / src_w, 1), order=3)
+    
+    return cupy.asnumpy(cupy.clip(src + 0.5, 0, 255).astype(cupy.uint8))
+
+def normalize_pillow_mode(img):
+    """Bring decoded textures into 8-bit modes that resample and encode correctly.
+    
+    16-bit grayscale ('I;16', 'I') is rescaled to 'L' (plain convert() clips it to
+    white), and palette/1-bit images are expanded so resizing isn't forced to NEAREST.
+    """
+    if img.mode.startswith('I'):
+        values = np.asarray(img).astype(np.uint32)
+        return Image.fromarray((values >> 8).clip(0, 255).astype(np.uint8), 'L')
+    if img.mode in ('P', 'PA'):
+        return img.convert('RGBA' if img.mode == 'PA' or 'transparency' in img.info else 'RGB')
+    if img.mode == '1':
+        return img.convert('RGB')
+    return img
+
+def encode_texture_pillow(data, target_format, width, height, quality, normal_map=False):
+    """Resize and encode a texture in-process with Pillow, returning the encoded bytes.
+    
+    data is either encoded PNG/JPEG bytes or an HxWx4 uint8 RGBA pixel array.
+    Normal maps are stored as 8-bit RGB PNG: glTF ignores their alpha channel
+    and 16-bit precision, which would otherwise double or quadruple the size.
+    """
+    if isinstance(data, np.ndarray):
+        img = Image.fromarray(data, 'RGBA')
+    else:
+        img = Image.open(io.BytesIO(data))
+        if img.format == 'JPEG' and (img.width > width or img.height > height):
+            # Let libjpeg-turbo decode straight at 1/2, 1/4 or 1/8 scale (IDCT scaling),
+            # never below the target size, so e.g. 4096 -> 512 decodes a 512 image
+            img.draft(img.mode, (width, height))
+        img = normalize_pillow_mode(img)
+    if normal_map:
+        img = img.convert('RGB')
+    
+    if img.width > width or img.height > height:
+        if USE_GPU_RESIZE and cupy is not None and max(img.size) >= GPU_RESIZE_MIN_SIZE:
+            mode = 'RGBA' if 'A' in img.getbands() else 'RGB'
+            img = Image.fromarray(resize_pixels_gpu(np.asarray(img.convert(mode)), width, height), mode)
+        else:
+            factor = img.width // width
+            if (img.width == width * factor and img.height == height * factor
+                    and factor & (factor - 1) == 0 and img.mode in ('L', 'LA', 'RGB', 'RGBA')):
+                # Exact power-of-two reduction (e.g. 2048 -> 512): a box filter touches each
+                # source pixel once with no fractional-coordinate resampling
+                img = img.reduce(factor)
+            else:
+                img = img.resize((width, height), Image.Resampling.LANCZOS)
+    
+    buf = io.BytesIO()
+    if target_format == 'JPEG':
+        # Optimized Huffman tables, baseline (not progressive) for fast decoding in viewers
+        img.convert('RGB').save(buf, 'JPEG', quality=quality, optimize=True, progressive=False, subsampling=2)
+        if JPEG_ENCODER == 'mozjpeg' and mozjpeg_lossless_optimization is not None:
+            # Lossless: only the entropy coding changes, decoded pixels are identical
+            return mozjpeg_lossless_optimization.optimize(buf.getvalue())
+    else:
+        img.save(buf, 'PNG', compress_level=PNG_COMPRESS_LEVEL)
+    return buf.getvalue()
+
+def pack_encoded_image(image, data, target_format):
+    """Replace an image's contents with already-encoded bytes, embedded in the file."""
+    ext = '.jpg' if target_format == 'JPEG' else '.png'
+    
+    if image.packed_file is not None:
+        image.unpack(method='REMOVE')
+    
+    image.source = 'FILE'
+    image.filepath_raw = f"//{Path(image.name).stem}{ext}"
+    image.file_format = target_format
+    image.pack(data=data, data_len=len(data))
+    image.reload()
+
+@dataclass
+class TexJob:
+    """A texture queued for Pillow encoding: encoded bytes or RGBA pixels in, encoded bytes out."""
+    image: object
+    source: object
+    dst_w: int
+    dst_h: int
+    fmt: str
+    quality: int
+    original_packed: bool
+    normal_map: bool = False
+
+def hash_bytes(data):
+    """Hash texture bytes for the encode cache (xxh3 when available)."""
+    if xxhash is not None:
+        return xxhash.xxh3_64_intdigest(data)
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+# Bump when the encode output changes so stale CACHE_DIR entries are not reused
+TEXTURE_CACHE_VERSION = 1
+
+def texture_cache_path(key):
+    """Path of the on-disk CACHE_DIR entry for an encode key, or None when disabled."""
+    if not CACHE_DIR:
+        return None
+    digest, fmt, width, height, quality, normal_map = key
+    digest = digest.hex() if isinstance(digest, bytes) else f"{digest:016x}"
+    ext = 'jpg' if fmt == 'JPEG' else 'png'
+    if fmt == 'JPEG':
+        suffix = f"_{JPEG_ENCODER}"
+    else:
+        suffix = f"_z{PNG_COMPRESS_LEVEL}" + ('_n' if normal_map else '')
+    backend = 'gpu' if USE_GPU_RESIZE and cupy is not None else 'cpu'
+    name = f"v{TEXTURE_CACHE_VERSION}_{digest}_{width}x{height}_q{quality}{suffix}_{backend}.{ext}"
+    return os.path.join(CACHE_DIR, name)
+
+def read_texture_cache(key):
+    """Return cached encoded bytes from CACHE_DIR, or None on a miss."""
+    path = texture_cache_path(key)
+    if path is None:
+        return None
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    except OSError:
+        return None
+
+def write_texture_cache(key, encoded):
+    """Store encoded bytes in CACHE_DIR atomically (safe with concurrent workers)."""
+    path = texture_cache_path(key)
+    if path is None:
+        return
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(encoded)
+        os.replace(temp_path, path)
+    except OSError as e:
+        if VERBOSE:
+            log(f"Warning: Could not write texture cache entry '{path}': {e}")
+
+def get_texture_worker_count():
+    """Number of texture encode threads (TEXTURE_WORKERS, or this process's share of the CPU cores)."""
+    if TEXTURE_WORKERS > 0:
+        return TEXTURE_WORKERS
+    return max(1, (os.cpu_count() or 1) // _parallel_workers)
+
+def encode_texture_job(job):
+    """Run one Pillow encode job (thread-safe: touches no bpy data).
+    
+    Returns (encoded_bytes, from_cache). Identical source textures shared by
+    several files in the batch are only resized and encoded once; with
+    CACHE_DIR set, also only once across runs and worker processes.
+    """
+    global _tex_cache_bytes
+    
+    key = (hash_bytes(job.source), job.fmt, job.dst_w, job.dst_h, job.quality, job.normal_map)
+    encoded = TEX_CACHE.get(key)
+    if encoded is not None:
+        return encoded, True
+    
+    encoded = read_texture_cache(key)
+    from_cache = encoded is not None
+    if encoded is None:
+        encoded = encode_texture_pillow(job.source, job.fmt, job.dst_w, job.dst_h, job.quality, job.normal_map)
+        write_texture_cache(key, encoded)
+    
+    with _tex_cache_lock:
+        if key not in TEX_CACHE and _tex_cache_bytes + len(encoded) <= TEXTURE_CACHE_LIMIT_MB * 1024 * 1024:
+            TEX_CACHE[key] = encoded
+            _tex_cache_bytes += len(encoded)
+    return encoded, from_cache
+
+def run_texture_jobs(jobs):
+    """Encode queued textures in a thread pool, then pack the results on the main thread.
+    
+    Jobs are grouped by (format, size) so similar encodes run back to back, and
+    Pillow releases the GIL while resampling/encoding so the threads overlap.
+    Any job that fails falls back to Blender's own image pipeline.
+    """
+    if not jobs:
+        return
+    
+    jobs.sort(key=lambda job: (job.fmt, job.dst_w, job.dst_h))
+    
+    with ThreadPoolExecutor(max_workers=get_texture_worker_count()) as executor:
+        futures = [executor.submit(encode_texture_job, job) for job in jobs]
         
-        # Remove the marked nodes
-        for node in nodes_to_remove:
+        for job, future in zip(jobs, futures):
+            image = job.image
             try:
-                node_name = node.name
-                material.node_tree.nodes.remove(node)
+                encoded, from_cache = future.result()
+                pack_encoded_image(image, encoded, job.fmt)
                 if VERBOSE:
-                    log(f"Successfully removed node '{node_name}' from material '{material.name}'")
+                    source = "Reused cached encode for" if from_cache else "Encoded"
+                    log(f"{source} '{image.name}' with Pillow: {memoryview(job.source).nbytes / 1024:.1f}KB → {len(encoded) / 1024:.1f}KB")
             except Exception as e:
                 if VERBOSE:
-                    log(f"Warning: Could not remove node '{node.name}' from material '{material.name}': {e}", "WARNING")
-            
-    except Exception as e:
-        log(f"Warning: Error cleaning material properties for '{material.name}': {e}", "WARNING")
+                    log(f"Warning: Pillow compression failed for '{image.name}', using Blender fallback: {e}")
+                process_image_blender(image, job.fmt, job.original_packed)
 
 def apply_texture_compression(image, target_format):
     """Apply texture compression by setting format and compressing via file save/reload."""
@@ -282,8 +802,13 @@ def apply_texture_compression(image, target_format):
         if not image:
             return
         
+        # Unmodified image already stored in the target format: nothing to re-encode
+        if image.file_format == target_format and not image.is_dirty and not FORCE_COMPRESSION:
+            if VERBOSE:
+                log(f"'{image.name}' already {target_format} and unmodified, skipping compression")
+            return
+        
         original_format = image.file_format
-        was_packed = image.packed_file is not None
         
         if target_format == 'JPEG':
             if VERBOSE:
@@ -309,29 +834,16 @@ def apply_texture_compression(image, target_format):
                     temp_dir = tempfile.gettempdir()
                     temp_file = os.path.join(temp_dir, f"temp_{image.name}.jpg")
                     
-                    # Set render settings for JPEG quality (used by image.save_render)
-                    original_quality = bpy.context.scene.render.image_settings.quality
-                    original_format = bpy.context.scene.render.image_settings.file_format
-                    
-                    bpy.context.scene.render.image_settings.file_format = 'JPEG'
-                    bpy.context.scene.render.image_settings.quality = JPEG_QUALITY
-                    
                     # Save with JPEG compression using render settings
+                    # (set once per batch by process_file_list)
                     image.filepath_raw = temp_file
                     image.save_render(temp_file)
                     
-                    # Restore original render settings
-                    bpy.context.scene.render.image_settings.quality = original_quality
-                    bpy.context.scene.render.image_settings.file_format = original_format
-                    
-                    # Reload the compressed version
-                    image.filepath = temp_file
-                    image.source = 'FILE'
-                    image.reload()
-                    
-                    # Pack if it was originally packed
-                    if was_packed:
-                        image.pack()
+                    # Embed the compressed bytes directly; this is the only
+                    # read of the temp file (no reload-from-disk, then pack)
+                    with open(temp_file, 'rb') as f:
+                        data = f.read()
+                    pack_encoded_image(image, data, 'JPEG')
                     
                     # Clean up temp file
                     try:
@@ -352,95 +864,184 @@ def apply_texture_compression(image, target_format):
             if VERBOSE:
                 log(f"Keeping '{image.name}' as PNG format")
         
-        # Update the image
-        image.update()
-        
     except Exception as e:
         log(f"Warning: Error applying compression to '{image.name}': {e}", "WARNING")
 
+def box_downsample(pixels, width, height, target_width, target_height):
+    """Average-pool a flat RGBA float buffer by integer factors (e.g. 2048 -> 512)."""
+    fy, fx = height // target_height, width // target_width
+    blocks = pixels.reshape(target_height, fy, target_width, fx, 4)
+    return blocks.mean(axis=(1, 3), dtype=np.float32).ravel()
+
+def replace_image_pixels(image, pixels, width, height):
+    """Swap every user of image over to a new image holding the given pixels.
+    
+    One foreach_set instead of image.scale's resampling; returns the new image,
+    which takes over the old image's name.
+    """
+    name = image.name
+    new_image = bpy.data.images.new(name + ".resized", width, height, alpha=True,
+                                    float_buffer=image.is_float)
+    new_image.colorspace_settings.name = image.colorspace_settings.name
+    new_image.alpha_mode = image.alpha_mode
+    new_image.pixels.foreach_set(pixels)
+    image.user_remap(new_image)
+    bpy.data.images.remove(image)
+    new_image.name = name
+    return new_image
+
 def resize_image(image, target_width, target_height):
-    """Resize a Blender image to target dimensions."""
-    try:
-        if image.size[0] <= target_width and image.size[1] <= target_height:
-            if VERBOSE:
-                log(f"Image '{image.name}' already at or below target resolution ({image.size[0]}x{image.size[1]})")
-            return False
-            
+    """Resize a Blender image to target dimensions if it is larger.
+    
+    Returns the image to keep using: integer downscales swap in a new image
+    (see replace_image_pixels), other sizes are scaled in place.
+    """
+    name = image.name
+    width, height = image.size[0], image.size[1]
+    if width <= target_width and height <= target_height:
         if VERBOSE:
-            log(f"Resizing '{image.name}' from {image.size[0]}x{image.size[1]} to {target_width}x{target_height}")
-        
-        # Scale the image
-        image.scale(target_width, target_height)
-        image.update()
-        return True
+            log(f"Image '{name}' already at or below target resolution ({width}x{height})")
+        return image
+    
+    if VERBOSE:
+        log(f"Resizing '{image.name}' from {width}x{height} to {target_width}x{target_height}")
+    
+    try:
+        if width % target_width == 0 and height % target_height == 0:
+            # Integer downscale (the usual power-of-two case): box filter in NumPy
+            pixels = SCRATCH.get(width * height * 4, np.float32)
+            image.pixels.foreach_get(pixels)
+            pixels = box_downsample(pixels, width, height, target_width, target_height)
+            image = replace_image_pixels(image, pixels, target_width, target_height)
+        else:
+            # Resize the image in memory
+            image.scale(target_width, target_height)
         
+        if VERBOSE:
+            log(f"Successfully resized texture '{image.name}'")
     except Exception as e:
-        log(f"Error resizing image '{image.name}': {e}", "ERROR")
+        log(f"Error resizing image '{name}': {e}", "ERROR")
+    
+    return image
+
+def process_image_blender(image, target_format, original_packed):
+    """Resize then compress a single image using Blender's own image pipeline.
+    
+    Resizing first means the pixels are encoded once, at the target size,
+    instead of saving and reloading a full-size copy that is then scaled.
+    """
+    # Resize if needed
+    image = resize_image(image, TARGET_RESOLUTION, TARGET_RESOLUTION)
+    
+    # Apply texture compression format to the already-resized pixels
+    apply_texture_compression(image, target_format)
+    
+    # If it was originally packed, keep it packed (embedded in GLB)
+    if original_packed and not image.packed_file:
+        try:
+            image.pack()
+            if VERBOSE:
+                log(f"Re-packed texture '{image.name}' for embedding")
+        except Exception as e:
+            log(f"Warning: Could not re-pack texture '{image.name}': {e}", "WARNING")
+
+def process_image(image, node, jobs=None):
+    """Optimize a single image; node is a representative image node using it.
+    
+    When a jobs list is given, textures that can be encoded with Pillow are
+    appended to it as TexJob entries instead of being processed inline.
+    Returns True if the image was compressed/resized.
+    """
+    # Skip specular tint images that should have been removed
+    image_name_lower = image.name.lower()
+    node_name_lower = node.name.lower()
+    if _SPEC_TINT_RE.search(image_name_lower) or _SPEC_TINT_RE.search(node_name_lower):
+        if VERBOSE:
+            log(f"Skipping specular tint texture that should have been removed: {image.name}")
         return False
+        
+    original_packed = image.packed_file is not None
+    
+    # Read the encoded dimensions from the header only, before any pixel decode
+    source = get_image_source_bytes(image)
+    header = peek_image_header(source) if source else None
+    
+    # Determine optimal format based on actual image content; PNGs whose header
+    # rules out transparency don't need their pixels loaded for the alpha check
+    if EXPORT_IMAGE_FORMAT == 'WEBP':
+        # The exporter does the one lossy encode to WebP; keep resized copies lossless until then
+        target_format = 'PNG'
+    elif TEXTURE_FORMAT == 'AUTO' and source and png_is_16bit_gray(source):
+        target_format = 'PNG'
+    elif header and header[0] == 'PNG' and not png_can_have_alpha(source):
+        target_format = get_texture_format(image.name, node.type, alpha=False)
+    else:
+        target_format = get_texture_format(image.name, node.type, image)
+    
+    # Skip textures that are already small enough and in the desired format
+    if header:
+        source_format, width, height = header
+        if (width <= TARGET_RESOLUTION and height <= TARGET_RESOLUTION
+                and (source_format == target_format or EXPORT_IMAGE_FORMAT == 'WEBP')):
+            if VERBOSE:
+                log(f"Skipping '{image.name}' ({width}x{height} {source_format}, {len(source) / 1024:.1f}KB left untouched)")
+            return False
+    
+    # With Pillow, every texture is resized (LANCZOS) and encoded in one pass
+    # instead of Blender's image.scale; jobs are encoded together after the walk
+    normal_map = target_format == 'PNG' and is_normal_map(image.name, node)
+    if jobs is not None and Image is not None and source is None:
+        # No encoded bytes to decode (generated or missing file): encode the pixels
+        # directly instead of a save_render/reload roundtrip through disk
+        try:
+            source = read_image_pixels_u8(image)
+        except Exception as e:
+            if VERBOSE:
+                log(f"Warning: Could not read pixels of '{image.name}': {e}")
+    if jobs is not None and Image is not None and source is not None:
+        jobs.append(TexJob(image, source, TARGET_RESOLUTION, TARGET_RESOLUTION,
+                           target_format, JPEG_QUALITY, original_packed, normal_map))
+    else:
+        process_image_blender(image, target_format, original_packed)
+    
+    return True
 
-def process_material_textures(material):
-    """Process all textures in a material."""
-    if not material.use_nodes:
-        return 0
+def collect_material_images(materials):
+    """Map each image used by the materials' image nodes to (representative node, material names)."""
+    image_refs = {}
+    for material in materials:
+        if not material.use_nodes:
+            continue
+        for node in material.node_tree.nodes:
+            if node.type == 'TEX_IMAGE' and node.image:
+                ref = image_refs.setdefault(node.image.name, (node, set()))
+                ref[1].add(material.name)
+    return image_refs
+
+def process_all_images_once(materials, jobs=None):
+    """Optimize every image used by the given materials exactly once.
     
+    Images shared by several materials (atlases, common normal maps) are
+    visited once through bpy.data.images instead of once per material.
+    Returns (texture_count, material_count).
+    """
+    image_refs = collect_material_images(materials)
+    processed_materials = set()
     processed_count = 0
     
-    for node in material.node_tree.nodes:
-        if node.type == 'TEX_IMAGE' and node.image:
-            image = node.image
-            
-            # Skip if image is already processed
-            if hasattr(image, '_bulk_processed'):
-                continue
-            
-            # Skip specular tint images that should have been removed
-            image_name_lower = image.name.lower()
-            node_name_lower = node.name.lower()
-            if any(keyword in image_name_lower for keyword in ['specular_tint', 'spectint', 'spec_tint', 'specular tint']) or \
-               any(keyword in node_name_lower for keyword in ['specular_tint', 'spectint', 'spec_tint', 'specular tint']):
-                if VERBOSE:
-                    log(f"Skipping specular tint texture that should have been removed: {image.name}")
-                continue
-                
-            original_packed = image.packed_file is not None
-            
-            # Determine optimal format based on actual image content
-            target_format = get_texture_format(image.name, node.type, image)
-            
-            # Apply texture compression format
-            apply_texture_compression(image, target_format)
-            
-            # Count this as processed since we applied compression
+    # Iterate over a snapshot: each image is visited exactly once, and images the
+    # Blender fallback swaps in for resized ones are never revisited
+    for image in list(bpy.data.images):
+        ref = image_refs.get(image.name)
+        if ref is None or image.users == 0:
+            continue
+        
+        node, material_names = ref
+        if process_image(image, node, jobs):
             processed_count += 1
-            
-            # Resize if needed
-            if image.size[0] > TARGET_RESOLUTION or image.size[1] > TARGET_RESOLUTION:
-                if VERBOSE:
-                    log(f"Resizing '{image.name}' from {image.size[0]}x{image.size[1]} to {TARGET_RESOLUTION}x{TARGET_RESOLUTION}")
-                
-                # Resize the image in memory
-                image.scale(TARGET_RESOLUTION, TARGET_RESOLUTION)
-                image.update()
-                
-                if VERBOSE:
-                    log(f"Successfully resized texture '{image.name}'")
-            else:
-                if VERBOSE:
-                    log(f"Image '{image.name}' already at or below target resolution ({image.size[0]}x{image.size[1]})")
-            
-            # If it was originally packed, keep it packed (embedded in GLB)
-            if original_packed and not image.packed_file:
-                try:
-                    image.pack()
-                    if VERBOSE:
-                        log(f"Re-packed texture '{image.name}' for embedding")
-                except Exception as e:
-                    log(f"Warning: Could not re-pack texture '{image.name}': {e}", "WARNING")
-            
-            # Mark as processed
-            image['_bulk_processed'] = True
+            processed_materials |= material_names
     
-    return processed_count
+    return processed_count, len(processed_materials)
 
 def get_file_type(filepath):
     """Determine file type based on extension."""
@@ -492,12 +1093,33 @@ def import_file(input_path):
         log(f"Unsupported file type: {input_path.suffix}", "ERROR")
         return False
 
+def gltf_image_export_options():
+    """Exporter image settings for EXPORT_IMAGE_FORMAT, limited to what this Blender supports."""
+    properties = bpy.ops.export_scene.gltf.get_rna_type().properties
+    image_format = EXPORT_IMAGE_FORMAT
+    if image_format not in properties['export_image_format'].enum_items.keys():
+        log(f"Warning: glTF exporter has no '{image_format}' image format, using AUTO", "WARNING")
+        image_format = 'AUTO'
+    
+    # AUTO copies already-encoded packed JPEG/PNG bytes as-is instead of re-encoding
+    options = {'export_image_format': image_format}
+    # The quality option was renamed from export_jpeg_quality in Blender 4.2
+    for quality_option in ('export_image_quality', 'export_jpeg_quality'):
+        if quality_option in properties:
+            options[quality_option] = JPEG_QUALITY
+            break
+    return options
+
 def export_file(output_path, file_type):
     """Export file based on desired output type."""
     try:
         # Ensure output directory exists
         output_path.parent.mkdir(parents=True, exist_ok=True)
         
+        # Static models skip the exporter's animation pass entirely (any action counts:
+        # shape key animation lives on mesh data, not on object.animation_data)
+        has_animation = bool(bpy.data.actions)
+        
         if file_type == 'vrm':
             # Export as VRM
             try:
@@ -515,10 +1137,11 @@ def export_file(output_path, file_type):
                     filepath=str(output_path),
                     export_format='GLTF_SEPARATE',
                     export_materials='EXPORT',
+                    **gltf_image_export_options(),
                     export_colors=True,
                     export_cameras=False,
                     export_lights=False,
-                    export_animations=True,
+                    export_animations=has_animation,
                     export_yup=True,
                     export_apply=False,
                     export_texcoords=True,
@@ -547,10 +1170,11 @@ def export_file(output_path, file_type):
                     filepath=str(output_path),
                     export_format='GLB',
                     export_materials='EXPORT',
+                    **gltf_image_export_options(),
                     export_colors=True,
                     export_cameras=False,
                     export_lights=False,
-                    export_animations=True,
+                    export_animations=has_animation,
                     export_yup=True,
                     export_apply=False,
                     export_texcoords=True,
@@ -578,11 +1202,221 @@ def export_file(output_path, file_type):
         log(f"Error exporting file '{output_path}': {e}", "ERROR")
         return False
 
+def can_use_gltf_transform(input_path, output_path):
+    """Check whether a file can skip Blender and go through the gltf-transform CLI."""
+    return (USE_GLTF_TRANSFORM and not REMOVE_SPECULAR and not USE_KTX2 and EXPORT_IMAGE_FORMAT == 'AUTO'
+            and TEXTURE_FORMAT in ('JPEG', 'PNG')
+            and input_path.suffix.lower() != '.vrm'
+            and output_path.suffix.lower() == '.glb'
+            and shutil.which('gltf-transform') is not None)
+
+def process_with_gltf_transform(input_path, output_path):
+    """Resize and recompress textures with gltf-transform, leaving meshes untouched."""
+    temp_path = output_path.with_name(output_path.stem + '.resized.glb')
+    compress = (['jpeg', '--quality', str(JPEG_QUALITY)] if TEXTURE_FORMAT == 'JPEG' else ['png'])
+    # Both steps share one FILE_TIMEOUT budget
+    deadline = time.monotonic() + FILE_TIMEOUT
+    try:
+        # Resize keeps the aspect ratio and never upscales
+        subprocess.run(['gltf-transform', 'resize', str(input_path), str(temp_path),
+                        '--width', str(TARGET_RESOLUTION), '--height', str(TARGET_RESOLUTION)],
+                       check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, timeout=FILE_TIMEOUT)
+        subprocess.run(['gltf-transform', compress[0], str(temp_path), str(output_path)] + compress[1:],
+                       check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                       timeout=max(0.0, deadline - time.monotonic()))
+        log(f"Successfully exported with gltf-transform: {output_path.name}")
+        return True
+    except (subprocess.SubprocessError, OSError) as e:
+        log(f"Warning: gltf-transform failed for '{input_path.name}', using Blender instead: {e}", "WARNING")
+        return False
+    finally:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+
+def encoded_has_alpha(data):
+    """Check encoded PNG/JPEG bytes for meaningful alpha, decoding only images that can have it."""
+    img = Image.open(io.BytesIO(data))
+    if 'A' not in img.getbands() and 'transparency' not in img.info:
+        return False
+    alpha = np.asarray(img.convert('RGBA').getchannel('A'))
+    return bool((alpha < 0.98 * 255).any())
+
+def can_process_direct(input_path, output_path):
+    """Check whether a file's textures can be optimized without importing it into Blender."""
+    return (DIRECT_GLB and Image is not None and EXPORT_IMAGE_FORMAT == 'AUTO'
+            and input_path.suffix.lower() == '.glb'
+            and output_path.suffix.lower() == '.glb')
+
+def process_glb_direct(input_path, output_path):
+    """Resize and re-encode the embedded textures of a GLB without Blender.
+    
+    Only the image bufferViews are replaced; every other buffer is copied as-is.
+    Returns False when the file needs the Blender path instead.
+    """
+    # Work on a memory map: image and mesh data are zero-copy slices of the
+    # page cache, streamed straight to the output file
+    with open(input_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        gltf, bin_start, bin_length = parse_glb(mm)
+        with memoryview(mm) as view:
+            # All slices must be gone before the map closes, so they live in a helper's
+            # frame. On failure the traceback would keep that frame (and the slices)
+            # alive, so only the error message is kept and re-raised once the map is closed
+            try:
+                return rewrite_glb_textures(input_path, output_path, gltf, view[bin_start:bin_start + bin_length])
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+    
+    raise RuntimeError(error)
+
+def direct_glb_blocker(gltf):
+    """Return why a GLB's layout can't be rewritten directly, or None if it can.
+    
+    The rewrite only relocates data that bufferViews on the embedded buffer 0
+    point at; offsets held elsewhere (e.g. EXT_meshopt_compression) would break.
+    """
+    buffers = gltf.get('buffers', [])
+    if len(buffers) > 1 or (buffers and 'uri' in buffers[0]):
+        return "external buffers"
+    for view in gltf.get('bufferViews', []):
+        if view.get('buffer', 0) != 0 or 'extensions' in view:
+            return "bufferView extensions or extra buffers"
+    unsupported = set(gltf.get('extensionsRequired', [])) - _DIRECT_GLB_EXTENSIONS
+    if unsupported:
+        return f"required extensions {', '.join(sorted(unsupported))}"
+    # Blender's specular cleanup also drops specular textures; leave those files to it
+    if REMOVE_SPECULAR and any(_SPEC_TEXTURE_SLOTS & material.get('extensions', {}).get('KHR_materials_specular', {}).keys()
+                               for material in gltf.get('materials', [])):
+        return "KHR_materials_specular textures"
+    return None
+
+def specular_removed(gltf):
+    """Check whether every lit material already has its specular zeroed."""
+    for material in gltf.get('materials', []):
+        extensions = material.get('extensions', {})
+        if 'KHR_materials_unlit' in extensions:
+            continue
+        specular = extensions.get('KHR_materials_specular')
+        if specular is None or specular.get('specularFactor', 1.0) != 0 or _SPEC_TEXTURE_SLOTS & specular.keys():
+            return False
+    return True
+
+def remove_gltf_specular(gltf):
+    """Zero specular in glTF material JSON the way the Blender path exports it.
+    
+    Blender imports a material without KHR_materials_specular with Specular IOR
+    Level 0.5; clean_material_properties sets it to 0 (tint white), which the
+    exporter writes as KHR_materials_specular {specularFactor: 0}.
+    Returns True if any material changed.
+    """
+    if specular_removed(gltf):
+        return False
+    for material in gltf.get('materials', []):
+        extensions = material.setdefault('extensions', {})
+        if 'KHR_materials_unlit' not in extensions:
+            extensions['KHR_materials_specular'] = {'specularFactor': 0.0}
+    used = gltf.setdefault('extensionsUsed', [])
+    if 'KHR_materials_specular' not in used:
+        used.append('KHR_materials_specular')
+    return True
+
+def rewrite_glb_textures(input_path, output_path, gltf, bin_data):
+    """Re-encode a parsed GLB's textures and write the result (see process_glb_direct)."""
+    blocker = direct_glb_blocker(gltf)
+    if blocker:
+        if VERBOSE:
+            log(f"'{input_path.name}' uses {blocker}, processing with Blender")
+        return False
+    
+    images = gltf.get('images', [])
+    textures = gltf.get('textures', [])
+    normal_images = set()
+    occlusion_images = set()
+    for material in gltf.get('materials', []):
+        for slot, found in (('normalTexture', normal_images), ('occlusionTexture', occlusion_images)):
+            info = material.get(slot)
+            if info and info['index'] < len(textures) and 'source' in textures[info['index']]:
+                found.add(textures[info['index']]['source'])
+    
+    jobs = []
+    for index, image in enumerate(images):
+        if 'bufferView' not in image or image.get('mimeType') not in ('image/png', 'image/jpeg'):
+            continue
+        
+        view = gltf['bufferViews'][image['bufferView']]
+        start = view.get('byteOffset', 0)
+        source = bin_data[start:start + view['byteLength']]
+        name = image.get('name') or f"image_{index}"
+        
+        normal_map = index in normal_images or bool(_NORMAL_MAP_RE.search(name))
+        if TEXTURE_FORMAT == 'AUTO' and (normal_map or index in occlusion_images or png_is_16bit_gray(source)):
+            target_format = 'PNG'
+        else:
+            alpha = TEXTURE_FORMAT == 'AUTO' and AGGRESSIVE_JPEG_CONVERSION and encoded_has_alpha(source)
+            target_format = get_texture_format(name, alpha=alpha)
+        
+        # Skip textures that are already small enough and in the desired format
+        header = peek_image_header(source)
+        if header:
+            source_format, width, height = header
+            if width <= TARGET_RESOLUTION and height <= TARGET_RESOLUTION and source_format == target_format:
+                if VERBOSE:
+                    log(f"Skipping '{name}' ({width}x{height} {source_format}, {len(source) / 1024:.1f}KB left untouched)")
+                continue
+        
+        jobs.append((image, TexJob(None, source, TARGET_RESOLUTION, TARGET_RESOLUTION, target_format,
+                                   JPEG_QUALITY, True, target_format == 'PNG' and normal_map)))
+    
+    materials_changed = REMOVE_SPECULAR and remove_gltf_specular(gltf)
+    
+    # With USE_KTX2 the file is still written below so its textures get converted
+    if not jobs and not materials_changed and not USE_KTX2:
+        fast_copy(input_path, output_path)
+        log(f"No textures to optimize, copied: {output_path.name}")
+        return True
+    
+    replacements = {}
+    with ThreadPoolExecutor(max_workers=get_texture_worker_count()) as executor:
+        for (image, job), (encoded, from_cache) in zip(jobs, executor.map(encode_texture_job, [job for _, job in jobs])):
+            replacements[image['bufferView']] = encoded
+            image['mimeType'] = 'image/jpeg' if job.fmt == 'JPEG' else 'image/png'
+            if VERBOSE:
+                source = "Reused cached encode for" if from_cache else "Encoded"
+                log(f"{source} '{image.get('name', image['bufferView'])}' with Pillow: {len(job.source) / 1024:.1f}KB → {len(encoded) / 1024:.1f}KB")
+    
+    parts = layout_glb_buffer(gltf, bin_data, replacements)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = str(output_path) + '.tmp'
+    write_glb(temp_path, gltf, parts)
+    os.replace(temp_path, output_path)
+    
+    if USE_KTX2:
+        try:
+            convert_glb_textures_to_ktx2(output_path)
+        except Exception as e:
+            log(f"Warning: KTX2 conversion failed for '{output_path.name}', keeping JPEG/PNG textures: {e}", "WARNING")
+    
+    log(f"Successfully rewrote textures directly: {output_path.name} ({len(replacements)} textures)")
+    return True
+
 def process_glb_file(input_path, output_path):
     """Process a single 3D file (GLB/GLTF/VRM)."""
     try:
         log(f"Processing: {input_path.name}")
         
+        # Texture-only work on plain glTF doesn't need Blender's import/export round-trip
+        if can_use_gltf_transform(input_path, output_path) and process_with_gltf_transform(input_path, output_path):
+            return True
+        
+        # Plain GLBs only need their embedded images rewritten, not a full re-export
+        if can_process_direct(input_path, output_path):
+            try:
+                if process_glb_direct(input_path, output_path):
+                    return True
+            except Exception as e:
+                log(f"Warning: Direct texture rewrite failed for '{input_path.name}', using Blender instead: {e}", "WARNING")
+        
         # Clear the scene
         clear_scene()
         
@@ -590,22 +1424,25 @@ def process_glb_file(input_path, output_path):
         if not import_file(input_path):
             return False
         
+        # Only process materials that are actually used (one walk of bpy.data.materials)
+        used_materials = [material for material in bpy.data.materials if material.users > 0]
+        
         # First clean up all materials (remove specular tint, set specular to 0)
         if REMOVE_SPECULAR:
-            for material in bpy.data.materials:
-                if material.users > 0:  # Only process materials that are actually used
-                    clean_material_properties(material)
+            for material in used_materials:
+                clean_material_properties(material)
+            purge_orphan_images()
+        
+        # Process each texture used by the materials once
+        texture_jobs = []
+        total_textures_processed, processed_materials = process_all_images_once(used_materials, texture_jobs)
         
-        # Process materials and textures
-        total_textures_processed = 0
-        processed_materials = 0
+        # Encode all queued textures in one batch
+        run_texture_jobs(texture_jobs)
         
-        for material in bpy.data.materials:
-            if material.users > 0:  # Only process materials that are actually used
-                texture_count = process_material_textures(material)
-                if texture_count > 0:
-                    processed_materials += 1
-                    total_textures_processed += texture_count
+        # One dependency graph update for all image/material changes, instead of
+        # an image.update() after every resize and re-encode
+        bpy.context.view_layer.update()
         
         log(f"Processed {total_textures_processed} textures across {processed_materials} materials")
         
@@ -621,6 +1458,12 @@ def process_glb_file(input_path, output_path):
             # Export as GLB
             success = export_file(output_path, 'glb')
         
+        if success and USE_KTX2 and output_path.suffix.lower() == '.glb':
+            try:
+                convert_glb_textures_to_ktx2(output_path)
+            except Exception as e:
+                log(f"Warning: KTX2 conversion failed for '{output_path.name}', keeping JPEG/PNG textures: {e}", "WARNING")
+        
         if success:
             log(f"Successfully exported: {output_path.name}")
             return True
@@ -628,8 +1471,11 @@ def process_glb_file(input_path, output_path):
             return False
             
     except Exception as e:
-        log(f"Error processing GLTF/GLB file '{input_path}': {e}", "ERROR")
-        traceback.print_exc()
+        log(f"Error processing GLTF/GLB file '{input_path}': {type(e).__name__}: {e}", "ERROR")
+        # Full stack traces only when VERBOSE, collected and printed after the batch
+        # so they don't interleave with (or bury) the per-file progress log
+        if VERBOSE:
+            ERROR_TRACEBACKS.append((input_path.name, traceback.format_exc()))
         return False
 
 def get_file_size_mb(filepath):
@@ -639,25 +1485,561 @@ def get_file_size_mb(filepath):
     except:
         return 0
 
+def peek_gltf(path):
+    """Read only the JSON part of a .glb/.vrm/.gltf file.
+    
+    Returns (gltf_dict, bin_offset) where bin_offset is the absolute file offset
+    of the GLB binary chunk payload (None for text .gltf files).
+    """
+    with open(path, 'rb') as f:
+        magic, version, length = struct.unpack('<4sII', f.read(12))
+        if magic != b'glTF':
+            f.seek(0)
+            return json_loads(f.read()), None
+        
+        json_len, chunk_type = struct.unpack('<I4s', f.read(8))
+        if chunk_type != b'JSON':
+            raise ValueError(f"First GLB chunk is not JSON in {path}")
+        gltf = json_loads(f.read(json_len))
+        
+        # The BIN chunk (if any) follows the JSON chunk and its 8-byte header
+        return gltf, 12 + 8 + json_len + 8
+
+def is_already_optimized(input_path):
+    """Check from the glTF header alone whether a .glb/.vrm file has nothing left to optimize."""
+    try:
+        gltf, bin_offset = peek_gltf(input_path)
+        if bin_offset is None:
+            return False
+        
+        # Materials still need their specular zeroed (see remove_gltf_specular)
+        if REMOVE_SPECULAR and not specular_removed(gltf):
+            return False
+        
+        # Map the file so only the pages holding each image header are read
+        buffer_views = gltf.get('bufferViews', [])
+        with open(input_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for image in gltf.get('images', []):
+                if 'bufferView' not in image:
+                    return False
+                
+                # Only the first 64KB is needed to reach the PNG/JPEG size header
+                view = buffer_views[image['bufferView']]
+                start = bin_offset + view.get('byteOffset', 0)
+                header = peek_image_header(mm[start:start + min(view['byteLength'], 65536)])
+                if header is None:
+                    return False
+                
+                image_format, width, height = header
+                if image_format != 'JPEG' or TEXTURE_FORMAT == 'PNG':
+                    return False
+                if width > TARGET_RESOLUTION or height > TARGET_RESOLUTION:
+                    return False
+        
+        return True
+        
+    except Exception as e:
+        if VERBOSE:
+            log(f"Warning: Could not inspect header of '{input_path.name}': {e}")
+        return False
+
+def parse_glb(buf):
+    """Parse GLB chunk headers in a bytes-like buffer.
+    
+    Returns (gltf_dict, bin_start, bin_length); only the JSON chunk is copied.
+    """
+    magic, version, length = struct.unpack_from('<4sII', buf, 0)
+    if magic != b'glTF':
+        raise ValueError("Not a GLB file")
+    
+    gltf = None
+    bin_start = bin_length = 0
+    offset = 12
+    while offset < length:
+        chunk_len, chunk_type = struct.unpack_from('<I4s', buf, offset)
+        if chunk_type == b'JSON':
+            gltf = json_loads(buf[offset + 8:offset + 8 + chunk_len])
+        elif chunk_type == b'BIN\x00':
+            bin_start, bin_length = offset + 8, chunk_len
+        offset += 8 + chunk_len
+    
+    return gltf, bin_start, bin_length
+
+def read_glb(path):
+    """Read a GLB file into (gltf_dict, bin_bytes).
+    
+    The file is memory-mapped so only the chunks themselves are copied out,
+    instead of holding the whole file and its chunk copies at once.
+    """
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        gltf, bin_start, bin_length = parse_glb(mm)
+        bin_data = mm[bin_start:bin_start + bin_length]
+    
+    return gltf, bin_data
+
+def write_glb(path, gltf, bin_data):
+    """Write a GLB file from a glTF dict and binary chunk payload.
+    
+    bin_data is a bytes-like object or a list of them (see layout_glb_buffer),
+    written piece by piece without joining them in memory first.
+    """
+    json_data = json.dumps(gltf, separators=(',', ':')).encode('utf-8')
+    json_data += b' ' * (-len(json_data) % 4)
+    parts = bin_data if isinstance(bin_data, list) else [bin_data]
+    bin_length = sum(len(part) for part in parts)
+    bin_padding = b'\x00' * (-bin_length % 4)
+    bin_length += len(bin_padding)
+    
+    length = 12 + 8 + len(json_data) + (8 + bin_length if bin_length else 0)
+    with open(path, 'wb') as f:
+        f.write(struct.pack('<4sII', b'glTF', 2, length))
+        f.write(struct.pack('<I4s', len(json_data), b'JSON'))
+        f.write(json_data)
+        if bin_length:
+            f.write(struct.pack('<I4s', bin_length, b'BIN\x00'))
+            for part in parts:
+                f.write(part)
+            f.write(bin_padding)
+
+def layout_glb_buffer(gltf, bin_data, replacements):
+    """Lay out the GLB binary chunk with some bufferViews' contents replaced.
+    
+    replacements maps bufferView index -> new bytes. Views are laid out in
+    order with 8-byte alignment and buffer 0's byteLength is updated. Returns
+    the list of pieces (slices of bin_data, replacements and padding).
+    """
+    parts = []
+    size = 0
+    for index, view in enumerate(gltf.get('bufferViews', [])):
+        if view.get('buffer', 0) != 0:
+            continue
+        start = view.get('byteOffset', 0)
+        data = replacements.get(index, bin_data[start:start + view['byteLength']])
+        if size % 8:
+            parts.append(b'\x00' * (-size % 8))
+            size += len(parts[-1])
+        view['byteOffset'] = size
+        view['byteLength'] = len(data)
+        parts.append(data)
+        size += len(data)
+    
+    gltf['buffers'][0]['byteLength'] = size
+    return parts
+
+def rebuild_glb_buffer(gltf, bin_data, replacements):
+    """Repack the GLB binary chunk with some bufferViews' contents replaced (see layout_glb_buffer)."""
+    return b''.join(layout_glb_buffer(gltf, bin_data, replacements))
+
+def encode_ktx2(data, mime_type, linear, normal_map):
+    """Encode PNG/JPEG bytes to KTX2 with the basisu CLI, returning the KTX2 bytes."""
+    ext = '.jpg' if mime_type == 'image/jpeg' else '.png'
+    with tempfile.TemporaryDirectory() as temp_dir:
+        src = os.path.join(temp_dir, 'texture' + ext)
+        dst = os.path.join(temp_dir, 'texture.ktx2')
+        with open(src, 'wb') as f:
+            f.write(data)
+        
+        # ETC1S keeps color textures small; UASTC preserves normal/data maps
+        cmd = ['basisu', '-ktx2', '-mipmap', '-output_file', dst]
+        if normal_map:
+            cmd += ['-uastc', '-uastc_level', '2', '-normal_map']
+        elif linear:
+            cmd += ['-uastc', '-uastc_level', '2', '-linear']
+        cmd.append(src)
+        subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, cwd=temp_dir)
+        
+        with open(dst, 'rb') as f:
+            return f.read()
+
+def convert_glb_textures_to_ktx2(path):
+    """Re-encode every embedded texture of a GLB as KTX2 via KHR_texture_basisu."""
+    if shutil.which('basisu') is None:
+        log("USE_KTX2 is enabled but the 'basisu' tool was not found on PATH; keeping JPEG/PNG", "WARNING")
+        return False
+    
+    gltf, bin_data = read_glb(path)
+    images = gltf.get('images', [])
+    textures = gltf.get('textures', [])
+    
+    # Color textures are sRGB; everything else (normal, ORM, ...) is linear data
+    srgb_textures = set()
+    normal_textures = set()
+    for material in gltf.get('materials', []):
+        pbr = material.get('pbrMetallicRoughness', {})
+        for info in (pbr.get('baseColorTexture'), material.get('emissiveTexture')):
+            if info:
+                srgb_textures.add(info['index'])
+        if material.get('normalTexture'):
+            normal_textures.add(material['normalTexture']['index'])
+    
+    replacements = {}
+    converted = {}
+    for texture_index, texture in enumerate(textures):
+        source = texture.get('source')
+        if source is None or source in converted:
+            continue
+        image = images[source]
+        if 'bufferView' not in image or image.get('mimeType') not in ('image/png', 'image/jpeg'):
+            continue
+        
+        view = gltf['bufferViews'][image['bufferView']]
+        start = view.get('byteOffset', 0)
+        replacements[image['bufferView']] = encode_ktx2(
+            bin_data[start:start + view['byteLength']], image['mimeType'],
+            linear=texture_index not in srgb_textures, normal_map=texture_index in normal_textures)
+        image['mimeType'] = 'image/ktx2'
+        converted[source] = True
+    
+    if not converted:
+        return False
+    
+    for texture in textures:
+        if texture.get('source') in converted:
+            texture.setdefault('extensions', {})['KHR_texture_basisu'] = {'source': texture.pop('source')}
+    for key in ('extensionsUsed', 'extensionsRequired'):
+        if 'KHR_texture_basisu' not in gltf.setdefault(key, []):
+            gltf[key].append('KHR_texture_basisu')
+    
+    bin_data = rebuild_glb_buffer(gltf, bin_data, replacements)
+    temp_path = str(path) + '.tmp'
+    write_glb(temp_path, gltf, bin_data)
+    os.replace(temp_path, path)
+    
+    if VERBOSE:
+        log(f"Converted {len(converted)} textures to KTX2 in {Path(path).name}")
+    return True
+
+def fast_copy(src, dst):
+    """Copy a file in the kernel (copy_file_range) where supported, else in 1MB chunks."""
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        size = os.fstat(fsrc.fileno()).st_size
+        try:
+            copied = 0
+            while copied < size:
+                count = os.copy_file_range(fsrc.fileno(), fdst.fileno(), size - copied)
+                if count == 0:
+                    break
+                copied += count
+        except (OSError, AttributeError):
+            # Not Linux 4.5+ or a cross-filesystem copy the kernel refuses
+            fsrc.seek(0)
+            fdst.seek(0)
+            fdst.truncate()
+            shutil.copyfileobj(fsrc, fdst, length=1 << 20)
+
+def get_output_filename(glb_file):
+    """Determine output filename based on input type and settings."""
+    input_type = get_file_type(glb_file)
+    if input_type == 'vrm':
+        # VRM files always keep .vrm extension
+        return glb_file.stem + '.vrm'
+    elif PRESERVE_FORMAT:
+        # Keep original format if preserve format is enabled
+        return glb_file.name
+    else:
+        # Convert GLTF to GLB for efficiency
+        return glb_file.stem + '.glb'
+
+def enumerate_inputs(input_dir, output_dir):
+    """Scan the input directory once and split supported files into (pending, skipped, sizes).
+    
+    Uses a single os.scandir pass per directory: DirEntry carries the name and
+    type without an extra stat, and output existence is a set lookup instead
+    of one exists() call per input file. sizes maps each input file to its
+    size in MB, taken from the same scan.
+    """
+    sizes = {}
+    with os.scandir(input_dir) as entries:
+        for entry in entries:
+            if entry.is_file() and entry.name.lower().endswith(SUPPORTED_EXTENSIONS):
+                sizes[Path(entry.path)] = entry.stat().st_size / (1024 * 1024)
+    glb_files = sorted(sizes)
+    
+    existing = set()
+    if SKIP_EXISTING:
+        with os.scandir(output_dir) as entries:
+            existing = {os.path.normcase(entry.name) for entry in entries}
+    
+    pending = []
+    skipped = []
+    for glb_file in glb_files:
+        if os.path.normcase(get_output_filename(glb_file)) in existing:
+            skipped.append(glb_file)
+        else:
+            pending.append(glb_file)
+    
+    return pending, skipped, sizes
+
+def new_stats():
+    """Create an empty batch statistics record."""
+    return {'processed': 0, 'skipped': 0, 'errors': 0, 'size_before': 0.0, 'size_after': 0.0}
+
+def record_result(stats, result):
+    """Accumulate a single file result into the batch statistics."""
+    status = result['status']
+    if status == 'processed':
+        stats['processed'] += 1
+        stats['size_before'] += result['original_size']
+        stats['size_after'] += result['new_size']
+    elif status == 'skipped':
+        stats['skipped'] += 1
+    else:
+        stats['errors'] += 1
+
+def process_single_file(glb_file, output_path, original_size=None):
+    """Process one input file and return its result record.
+    
+    original_size (MB) can be passed in from the directory scan to skip a stat.
+    """
+    output_file = output_path / get_output_filename(glb_file)
+    result = {'file': glb_file.name, 'status': 'error', 'original_size': 0.0, 'new_size': 0.0}
+    
+    # Record original file size
+    if original_size is None:
+        original_size = get_file_size_mb(glb_file)
+    
+    # Same-format files with nothing to optimize are copied without a Blender round-trip
+    if (SKIP_OPTIMIZED_FILES and not USE_KTX2 and EXPORT_IMAGE_FORMAT == 'AUTO' and glb_file.suffix.lower() == output_file.suffix.lower() in ('.glb', '.vrm')
+            and is_already_optimized(glb_file)):
+        log(f"Already optimized, copying as-is: {glb_file.name}")
+        try:
+            fast_copy(glb_file, output_file)
+        except OSError as e:
+            log(f"Error copying '{glb_file.name}' to output: {e}", "ERROR")
+            return result
+        result.update(status='processed', original_size=original_size, new_size=original_size)
+        return result
+    
+    # Process the file
+    if process_glb_file(glb_file, output_file):
+        new_size = get_file_size_mb(output_file)
+        
+        # Keep the untouched original when re-exporting didn't pay off
+        if (KEEP_ORIGINAL_IF_LARGER and new_size >= original_size
+                and glb_file.suffix.lower() == output_file.suffix.lower() in ('.glb', '.vrm')):
+            log(f"Optimized output is not smaller; copying original: {glb_file.name}")
+            try:
+                fast_copy(glb_file, output_file)
+            except OSError as e:
+                log(f"Error copying original '{glb_file.name}' to output: {e}", "ERROR")
+                return result
+            new_size = original_size
+        
+        compression_ratio = ((original_size - new_size) / original_size * 100) if original_size > 0 else 0
+        log(f"Size: {original_size:.2f}MB → {new_size:.2f}MB ({compression_ratio:+.1f}%)")
+        result.update(status='processed', original_size=original_size, new_size=new_size)
+    
+    return result
+
+def print_error_tracebacks():
+    """Print the tracebacks collected for failed files once, then reset the list."""
+    if not ERROR_TRACEBACKS:
+        return
+    log(f"\n{'='*50}")
+    log(f"TRACEBACKS ({len(ERROR_TRACEBACKS)} failed files)")
+    log(f"{'='*50}")
+    for name, formatted in ERROR_TRACEBACKS:
+        log(f"{name}:\n{formatted}", "ERROR")
+    ERROR_TRACEBACKS.clear()
+
+def prefetch_file(path):
+    """Pull a file into the OS page cache so the importer's read doesn't wait on disk."""
+    try:
+        if hasattr(os, 'posix_fadvise'):
+            fd = os.open(path, os.O_RDONLY)
+            try:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+            finally:
+                os.close(fd)
+        else:
+            # No readahead hint (Windows): read through the file and drop the data
+            with open(path, 'rb', buffering=0) as f:
+                while f.read(1 << 20):
+                    pass
+    except OSError:
+        pass  # Only an optimization; the importer reports real read errors
+
+def process_file_list(glb_files, output_path, report=False, sizes=None):
+    """Process files serially in this Blender instance.
+    
+    When report is True (worker mode), each result is also printed as a
+    RESULT_PREFIX line so the parent process can aggregate statistics.
+    sizes optionally maps files to their already-known size in MB.
+    """
+    sizes = sizes or {}
+    stats = new_stats()
+    
+    # JPEG render settings used by image.save_render in the Blender fallback,
+    # set once for the whole batch and restored even if processing fails
+    image_settings = bpy.context.scene.render.image_settings
+    original_settings = (image_settings.file_format, image_settings.quality)
+    image_settings.file_format = 'JPEG'
+    image_settings.quality = JPEG_QUALITY
+    
+    try:
+        # Read the next file into the OS page cache while the current one is processed
+        with ThreadPoolExecutor(max_workers=1) as prefetcher:
+            for i, glb_file in enumerate(glb_files, 1):
+                if i < len(glb_files):
+                    prefetcher.submit(prefetch_file, glb_files[i])
+                log(f"\n--- Processing file {i}/{len(glb_files)} ---")
+                result = process_single_file(glb_file, output_path, sizes.get(glb_file))
+                record_result(stats, result)
+                if report:
+                    print(RESULT_PREFIX + json.dumps(result), flush=True)
+    finally:
+        image_settings.file_format, image_settings.quality = original_settings
+    
+    print_error_tracebacks()
+    
+    return stats
+
+def parse_worker_args(argv=None):
+    """Parse worker arguments passed after Blender's '--' separator (None if not a worker)."""
+    argv = sys.argv if argv is None else argv
+    if '--' not in argv:
+        return None
+    parser = argparse.ArgumentParser(prog=os.path.basename(__file__))
+    parser.add_argument('--worklist', required=True)
+    parser.add_argument('--offset', type=int, required=True)
+    parser.add_argument('--count', type=int, required=True)
+    parser.add_argument('--workers', type=int, default=1)
+    return parser.parse_args(argv[argv.index('--') + 1:])
+
+def get_worker_count(file_count):
+    """Determine how many Blender workers to launch for the batch."""
+    if WORKER_COUNT > 0:
+        worker_count = WORKER_COUNT
+    else:
+        worker_count = max(1, (os.cpu_count() or 2) // 2)
+    return max(1, min(worker_count, file_count))
+
+def _pump_worker_output(label, proc, progress):
+    """Forward a worker's log lines and push its results onto the progress queue."""
+    for line in proc.stdout:
+        if line.startswith(RESULT_PREFIX):
+            try:
+                progress.put(json.loads(line[len(RESULT_PREFIX):]))
+                continue
+            except ValueError:
+                pass
+        print(f"[W{label}] {line}", end='')
+
+def run_worker_chunk(label, worklist_path, offset, count, worker_count, progress):
+    """Run one short-lived Blender worker over a slice of the worklist.
+    
+    Each worker exits after its slice, so Blender's leaked datablocks are
+    reclaimed by the OS, and a worker that hangs is killed after FILE_TIMEOUT
+    seconds per file.
+    """
+    cmd = [bpy.app.binary_path, '--background', '--python', os.path.abspath(__file__),
+           '--', '--worklist', worklist_path, '--offset', str(offset), '--count', str(count),
+           '--workers', str(worker_count)]
+    try:
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                text=True, encoding='utf-8', errors='replace')
+        pump = threading.Thread(target=_pump_worker_output, args=(label, proc, progress), daemon=True)
+        pump.start()
+        
+        try:
+            proc.wait(timeout=FILE_TIMEOUT * count)
+        except subprocess.TimeoutExpired:
+            log(f"Worker {label} timed out after {FILE_TIMEOUT * count}s; killing it", "WARNING")
+            proc.kill()
+            proc.wait()
+        
+        pump.join()
+        if proc.returncode != 0:
+            log(f"Worker {label} exited with code {proc.returncode}", "WARNING")
+    except Exception as e:
+        log(f"Error running worker {label}: {e}", "ERROR")
+    finally:
+        # Sentinel: this chunk has finished
+        progress.put(None)
+
+def run_workers(glb_files, worker_count, sizes):
+    """Process files in parallel across headless Blender subprocesses."""
+    # Hand the precomputed worklist (with sizes) to the workers so they don't rescan or stat
+    with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False, encoding='utf-8') as f:
+        json.dump([[str(glb_file), sizes.get(glb_file)] for glb_file in glb_files], f)
+        worklist_path = f.name
+    
+    # Small chunks keep every worker busy; FILES_PER_WORKER caps how long one process lives
+    chunk_size = max(1, min(FILES_PER_WORKER, -(-len(glb_files) // worker_count)))
+    offsets = range(0, len(glb_files), chunk_size)
+    log(f"Launching {worker_count} Blender workers for {len(offsets)} chunks of up to {chunk_size} files")
+    
+    progress = queue.Queue()
+    stats = new_stats()
+    done = 0
+    running = len(offsets)
+    
+    with ThreadPoolExecutor(max_workers=worker_count) as executor:
+        for label, offset in enumerate(offsets):
+            executor.submit(run_worker_chunk, label, worklist_path, offset,
+                            min(chunk_size, len(glb_files) - offset), worker_count, progress)
+        
+        while running:
+            result = progress.get()
+            if result is None:
+                running -= 1
+                continue
+            done += 1
+            record_result(stats, result)
+            log(f"Progress: {done}/{len(glb_files)} ({result['file']}: {result['status']})")
+    
+    try:
+        os.remove(worklist_path)
+    except OSError:
+        pass
+    
+    # Files whose worker crashed or timed out never reported a result
+    if done < len(glb_files):
+        log(f"{len(glb_files) - done} files did not report a result", "WARNING")
+        stats['errors'] += len(glb_files) - done
+    
+    return stats
+
 def main():
     """Main processing function."""
-    log("Starting GLTF/GLB/VRM Bulk Optimizer")
-    log(f"Input directory: {INPUT_DIR}")
-    log(f"Output directory: {OUTPUT_DIR}")
-    log(f"Target resolution: {TARGET_RESOLUTION}x{TARGET_RESOLUTION}")
-    log(f"Texture format: {TEXTURE_FORMAT}")
-    if REMOVE_SPECULAR:
-        log("Specular removal: ENABLED")
-    if AGGRESSIVE_JPEG_CONVERSION:
-        log("Aggressive JPEG conversion: ENABLED")
-    if FORCE_COMPRESSION:
-        log("Force compression: ENABLED")
-    if TEXTURE_FORMAT in ['AUTO', 'JPEG']:
-        log(f"JPEG quality: {JPEG_QUALITY}%")
+    global _parallel_workers
+    
+    worker_args = parse_worker_args()
+    
+    if worker_args is None:
+        log("Starting GLTF/GLB/VRM Bulk Optimizer")
+        log(f"Input directory: {INPUT_DIR}")
+        log(f"Output directory: {OUTPUT_DIR}")
+        log(f"Target resolution: {TARGET_RESOLUTION}x{TARGET_RESOLUTION}")
+        log(f"Texture format: {TEXTURE_FORMAT}")
+        if REMOVE_SPECULAR:
+            log("Specular removal: ENABLED")
+        if AGGRESSIVE_JPEG_CONVERSION:
+            log("Aggressive JPEG conversion: ENABLED")
+        if FORCE_COMPRESSION:
+            log("Force compression: ENABLED")
+        if TEXTURE_FORMAT in ['AUTO', 'JPEG']:
+            log(f"JPEG quality: {JPEG_QUALITY}%")
+        log(f"Pillow: {describe_pillow()}")
+    else:
+        # Workers report results line by line; keep output unbuffered and encodable
+        sys.stdout.reconfigure(encoding='utf-8', errors='replace', line_buffering=True)
+    
+    output_path = Path(OUTPUT_DIR)
+    
+    # Worker mode: only process this worker's slice of the parent's worklist
+    if worker_args is not None:
+        # Split the CPU cores between the parallel workers' texture encode threads
+        _parallel_workers = max(1, worker_args.workers)
+        with open(worker_args.worklist, encoding='utf-8') as f:
+            worklist = [(Path(name), size) for name, size in json.load(f)]
+        end = worker_args.offset + worker_args.count
+        worklist = worklist[worker_args.offset:end]
+        process_file_list([glb_file for glb_file, _ in worklist], output_path, report=True, sizes=dict(worklist))
+        return
     
     # Validate directories
     input_path = Path(INPUT_DIR)
-    output_path = Path(OUTPUT_DIR)
     
     if not input_path.exists():
         log(f"Error: Input directory does not exist: {INPUT_DIR}", "ERROR")
@@ -666,73 +2048,38 @@ def main():
     # Create output directory if it doesn't exist
     output_path.mkdir(parents=True, exist_ok=True)
     
-    # Find all .glb, .gltf, and .vrm files
-    glb_files = (list(input_path.glob("*.glb")) + list(input_path.glob("*.GLB")) + 
-                 list(input_path.glob("*.gltf")) + list(input_path.glob("*.GLTF")) +
-                 list(input_path.glob("*.vrm")) + list(input_path.glob("*.VRM")))
+    # Find all .glb, .gltf, and .vrm files and drop those already in the output directory
+    pending, skipped, sizes = enumerate_inputs(input_path, output_path)
+    total_files = len(pending) + len(skipped)
     
-    if not glb_files:
+    if total_files == 0:
         log("No .glb, .gltf, or .vrm files found in input directory", "WARNING")
         return
     
-    log(f"Found {len(glb_files)} .glb/.gltf/.vrm files to process")
+    log(f"Found {total_files} .glb/.gltf/.vrm files to process")
+    for glb_file in skipped:
+        log(f"Skipping existing file: {get_output_filename(glb_file)}")
     
-    # Process each file
-    processed_count = 0
-    skipped_count = 0
-    error_count = 0
-    total_size_before = 0
-    total_size_after = 0
-    
-    for i, glb_file in enumerate(glb_files, 1):
-        log(f"\n--- Processing file {i}/{len(glb_files)} ---")
-        
-        # Determine output filename based on input type and settings
-        input_type = get_file_type(glb_file)
-        if input_type == 'vrm':
-            # VRM files always keep .vrm extension
-            output_filename = glb_file.stem + '.vrm'
-        elif PRESERVE_FORMAT:
-            # Keep original format if preserve format is enabled
-            output_filename = glb_file.name
-        else:
-            # Convert GLTF to GLB for efficiency
-            output_filename = glb_file.stem + '.glb'
-        
-        output_file = output_path / output_filename
-        
-        # Skip if output file already exists and SKIP_EXISTING is True
-        if SKIP_EXISTING and output_file.exists():
-            log(f"Skipping existing file: {output_file.name}")
-            skipped_count += 1
-            continue
-        
-        # Record original file size
-        original_size = get_file_size_mb(glb_file)
-        total_size_before += original_size
-        
-        # Process the file
-        success = process_glb_file(glb_file, output_file)
-        
-        if success:
-            processed_count += 1
-            new_size = get_file_size_mb(output_file)
-            total_size_after += new_size
-            compression_ratio = ((original_size - new_size) / original_size * 100) if original_size > 0 else 0
-            log(f"Size: {original_size:.2f}MB → {new_size:.2f}MB ({compression_ratio:+.1f}%)")
-        else:
-            error_count += 1
+    # Process each file, in parallel workers when more than one is available
+    worker_count = get_worker_count(len(pending))
+    if worker_count > 1:
+        stats = run_workers(pending, worker_count, sizes)
+    else:
+        stats = process_file_list(pending, output_path, sizes=sizes)
+    stats['skipped'] += len(skipped)
     
     # Final summary
     log(f"\n{'='*50}")
     log("PROCESSING COMPLETE")
     log(f"{'='*50}")
-    log(f"Total files found: {len(glb_files)}")
-    log(f"Successfully processed: {processed_count}")
-    log(f"Skipped (already exist): {skipped_count}")
-    log(f"Errors: {error_count}")
+    log(f"Total files found: {total_files}")
+    log(f"Successfully processed: {stats['processed']}")
+    log(f"Skipped (already exist): {stats['skipped']}")
+    log(f"Errors: {stats['errors']}")
     
-    if processed_count > 0:
+    if stats['processed'] > 0:
+        total_size_before = stats['size_before']
+        total_size_after = stats['size_after']
         overall_compression = ((total_size_before - total_size_after) / total_size_before * 100) if total_size_before > 0 else 0
         log(f"Total size reduction: {total_size_before:.2f}MB → {total_size_after:.2f}MB ({overall_compression:+.1f}%)")
 
@@ -745,8 +2092,7 @@ if __name__ == "__main__":
         print("Usage: blender --background --python glb_bulk_optimizer.py")
         sys.exit(1)
     
-    # Set Blender to use CPU for rendering (more stable for batch processing)
-    bpy.context.scene.cycles.device = 'CPU'
+    configure_blender()
     
     # Run the main function
     main() 
\ No newline at end of file